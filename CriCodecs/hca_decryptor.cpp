@@ -14,6 +14,9 @@ namespace nb = nanobind;
 static constexpr uint32_t HCA_MASK  = 0x7F7F7F7F;
 static constexpr uint16_t SYNC_WORD = 0xFFFF;
 
+// base(8) + fmt(16) + dec(12, the smaller of comp/dec) + CRC(2)
+static constexpr uint16_t HCA_MIN_HEADER_SIZE = 8 + 16 + 12 + 2;
+
 static constexpr uint16_t CRC_TABLE[256] = {
     0x0000,0x8005,0x800F,0x000A,0x801B,0x001E,0x0014,0x8011,0x8033,0x0036,0x003C,0x8039,0x0028,0x802D,0x8027,0x0022,
     0x8063,0x0066,0x006C,0x8069,0x0078,0x807D,0x8077,0x0072,0x0050,0x8055,0x805F,0x005A,0x804B,0x004E,0x0044,0x8041,
@@ -103,10 +106,10 @@ struct HCAHeader {
     bool   used_comp   = true;
 };
 
-static HCAHeader parse_hca_header(const std::vector<uint8_t>& buf) {
-    if (buf.size() < 8)
+static HCAHeader parse_hca_header(const uint8_t* data, size_t size) {
+    if (size < 8)
         throw std::runtime_error("Error: File too small !");
-    const uint8_t* p   = buf.data();
+    const uint8_t* p   = data;
     uint32_t       tag = be32(p);
     p += 4;
     if ((tag & HCA_MASK) != 0x48434100)
@@ -114,15 +117,26 @@ static HCAHeader parse_hca_header(const std::vector<uint8_t>& buf) {
     HCAHeader h{};
     h.version = be16(p); p += 2;
     h.header_size = be16(p); p += 2;
-    if (buf.size() < h.header_size)
+    if (h.header_size < HCA_MIN_HEADER_SIZE)
+        throw std::runtime_error("Error: HCA header_size too small !");
+    if (size < h.header_size)
         throw std::runtime_error("Error: HCA head is too short !");
-    if (crc16_sum(buf.data(), h.header_size) != 0)
+    if (crc16_sum(data, h.header_size) != 0)
         throw std::runtime_error("Error: HCA header CRC failed !");
 
+    // Chunks live in [8, header_size - 2); the last 2 bytes are the CRC.
+    const uint8_t* end  = data + h.header_size - 2;
+    auto           need = [&](size_t n) {
+        if ((size_t)(end - p) < n)
+            throw std::runtime_error("Error: HCA header chunk overruns header_size !");
+    };
+    auto peek = [&]() -> uint32_t { return (end - p >= 4) ? be32(p) : 0; };
+
     // fmt
-    tag = be32(p);
+    tag = peek();
     if ((tag & HCA_MASK) != 0x666D7400)
         throw std::runtime_error("Error: HCA missing fmt !");
+    need(16);
     p += 4;
     h.channels    = *p++;
     h.sample_rate = be24(p); p += 3;
@@ -131,8 +145,9 @@ static HCAHeader parse_hca_header(const std::vector<uint8_t>& buf) {
     h.encoder_padding = be16(p); p += 2;
 
     // comp / dec
-    tag = be32(p);
+    tag = peek();
     if ((tag & HCA_MASK) == 0x636F6D70) {   // comp
+        need(16);
         p += 4;
         h.used_comp  = true;
         h.frame_size = be16(p); p += 2;
@@ -147,6 +162,7 @@ static HCAHeader parse_hca_header(const std::vector<uint8_t>& buf) {
         h.ms_stereo           = *p++;
         p++;   // reserved
     } else if ((tag & HCA_MASK) == 0x64656300) {   // dec\0
+        need(12);
         p += 4;
         h.used_comp  = false;
         h.frame_size = be16(p); p += 2;
@@ -165,72 +181,77 @@ static HCAHeader parse_hca_header(const std::vector<uint8_t>& buf) {
     }
 
     // vbr?
-    tag = be32(p);
+    tag = peek();
     if ((tag & HCA_MASK) == 0x76627200) {
+        need(8);
         p += 4;
         h.has_vbr            = true;
         h.vbr_max_frame_size = be16(p); p += 2;
         h.vbr_noise_level    = be16(p); p += 2;
-        tag = be32(p);
+        tag = peek();
     }
 
     // ath?
     if ((tag & HCA_MASK) == 0x61746800) {
+        need(6);
         p += 4;
         h.has_ath  = true;
         h.ath_type = be16(p); p += 2;
-        tag = be32(p);
+        tag = peek();
     } else {
         h.ath_type = (h.version < 0x0200) ? 1 : 0;
     }
 
     // loop?
     if ((tag & HCA_MASK) == 0x6C6F6F70) {
+        need(16);
         p += 4;
         h.loop_flag        = true;
         h.loop_start_frame = be32(p); p += 4;
         h.loop_end_frame   = be32(p); p += 4;
         h.loop_start_delay = be16(p); p += 2;
         h.loop_end_padding = be16(p); p += 2;
-        tag = be32(p);
+        tag = peek();
     }
 
     // ciph?
     if ((tag & HCA_MASK) == 0x63697068) {
+        need(6);
         p += 4;
         h.has_ciph  = true;
         h.ciph_type = be16(p); p += 2;
-        tag = be32(p);
+        tag = peek();
     } else {
         h.ciph_type = 0;
     }
 
     // rva?
     if ((tag & HCA_MASK) == 0x72766100) {
+        need(8);
         p += 4;
         uint32_t u = be32(p); p += 4;
         float f;
         std::memcpy(&f, &u, 4);
         h.has_rva    = true;
         h.rva_volume = f;
-        tag          = be32(p);
+        tag          = peek();
     }
 
     // comm?
     if ((tag & HCA_MASK) == 0x636F6D6D) {
+        need(5);
         p += 4;
         h.has_comm   = true;
         uint8_t clen = *p++;
+        need(clen);
         h.comment.assign((const char*)p, (const char*)p + clen);
         p += clen;
-        tag = be32(p);
+        tag = peek();
     }
 
     // pad?
     if ((tag & HCA_MASK) == 0x70616400) {
-        size_t used      = (size_t)(p - buf.data());
-        size_t pad_bytes = (h.header_size - 2) - used;
-        p += pad_bytes;
+        p = end;   // pad runs up to the CRC
     }
     // Else: without pad, p points to the end before the last CRC (2 bytes)
 
@@ -419,7 +440,7 @@ static inline uint64_t combine_keycode_with_subkey(uint64_t keycode, uint64_t su
 }
 
 static std::vector<uint8_t> decrypt_hca_to_plain_bytes(const std::vector<uint8_t>& in_bytes, uint64_t mainkey, nb::object py_subkey) {
-    HCAHeader H = parse_hca_header(in_bytes);
+    HCAHeader H = parse_hca_header(in_bytes.data(), in_bytes.size());
 
     uint64_t effective_key = mainkey & ((1ULL << 56) - 1);
     if (!py_subkey.is_none()) {
@@ -455,6 +476,25 @@ static std::vector<uint8_t> decrypt_hca_to_plain_bytes(const std::vector<uint8_t
     return out;
 }
 
+static nb::dict hca_info_dict(const HCAHeader& h) {
+    nb::dict d;
+    d["version"]          = h.version;
+    d["header_size"]      = h.header_size;
+    d["channels"]         = h.channels;
+    d["sample_rate"]      = h.sample_rate;
+    d["frame_count"]      = h.frame_count;
+    d["frame_size"]       = h.frame_size;
+    d["encoder_delay"]    = h.encoder_delay;
+    d["encoder_padding"]  = h.encoder_padding;
+    d["loop_flag"]        = h.loop_flag;
+    d["loop_start_frame"] = h.loop_start_frame;
+    d["loop_end_frame"]   = h.loop_end_frame;
+    d["loop_start_delay"] = h.loop_start_delay;
+    d["loop_end_padding"] = h.loop_end_padding;
+    d["ciph_type"]        = h.ciph_type;
+    return d;
+}
+
 NB_MODULE(hca_decryptor, m) {
     m.doc() = "HCA decryptor (no audio decode): decrypt to ciph=0 and rebuild CRCs";
 
@@ -483,4 +523,25 @@ Args:
 Returns:
   bytes of the decrypted .hca file
 )pbdoc");
+
+    // Python: read_hca_info(data: bytes) -> dict
+    m.def(
+        "read_hca_info",
+        [](nb::bytes data) -> nb::dict {
+            // Only the header is parsed, so data may be just the first header_size bytes.
+            HCAHeader h = parse_hca_header((const uint8_t*)data.c_str(), data.size());
+            return hca_info_dict(h);
+        },
+        nb::arg("data"),
+        R"pbdoc(
+Parse the header of an HCA file (plain or encrypted) without decrypting it.
+
+Args:
+  data: HCA bytes; at least the first header_size bytes (header_size is big-endian u16 at offset 6)
+
+Returns:
+  dict with version, header_size, channels, sample_rate, frame_count, frame_size,
+  encoder_delay, encoder_padding, loop_flag, loop_start_frame, loop_end_frame,
+  loop_start_delay, loop_end_padding and ciph_type
+)pbdoc");
 }
\ No newline at end of file
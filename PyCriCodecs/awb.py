@@ -1,10 +1,24 @@
 import os
+import shutil
+import hashlib
 from tqdm import tqdm
 from io import BytesIO, FileIO
 from struct import iter_unpack
 
+import numpy as np
+
 from .chunk import *
-from .hca_decryptor import decrypt
+from .hca_decryptor import decrypt, read_hca_info
+
+# Row layout of AWB.scan() (plus a trailing name column); header fields match read_hca_info().
+AWBScanDtype = [
+    ("id", "<u4"), ("offset", "<u8"), ("size", "<u8"), ("hca", "?"),
+    ("version", "<u2"), ("header_size", "<u2"), ("channels", "u1"), ("sample_rate", "<u4"),
+    ("frame_count", "<u4"), ("frame_size", "<u2"), ("encoder_delay", "<u2"), ("encoder_padding", "<u2"),
+    ("loop_flag", "?"), ("loop_start_frame", "<u4"), ("loop_end_frame", "<u4"),
+    ("loop_start_delay", "<u2"), ("loop_end_padding", "<u2"), ("ciph_type", "<u2"),
+    ("num_samples", "<i8"), ("duration", "<f8"), ("error", "U64"),
+]
 
 class AWB:
     def __init__(self, stream, mainkey):
@@ -39,23 +53,118 @@ class AWB:
     def extract(self, a: dict, exp_dir: str):
         os.makedirs(exp_dir, exist_ok=True)
 
+        names = self.entry_names(a)
+        for i in tqdm(range(len(self.ofs) - 1), ncols=150, position=1, leave=False):
+            if i not in names:
+                continue
+
+            data = self.read_entry(i)
+
+            filename = os.path.join(exp_dir, f"{';'.join(names[i])}.hca")
+            with open(filename, "wb") as f:
+                f.write(data)
+
+    def extract_cas(self, a: dict, store_dir: str, acb_name: str, manifest: dict, link_dir: str = None) -> dict:
+        # Content-addressed extraction: each unique (decrypted) waveform is stored once
+        # as store_dir/<hash[:2]>/<hash>.hca, and manifest[acb_name][cue] records its hash.
+        # With link_dir, link_dir/<acb_name>/<cue>.hca is hardlinked to the stored object.
+        names = self.entry_names(a)
+        cues = {}
+        if link_dir is not None:
+            view_dir = os.path.join(link_dir, acb_name)
+            os.makedirs(view_dir, exist_ok=True)
+
+        for i in tqdm(range(len(self.ofs) - 1), ncols=150, position=1, leave=False):
+            if i not in names:
+                continue
+
+            data = self.read_canonical(i)
+            digest = hashlib.sha256(data).hexdigest()
+            obj = self.store_object(store_dir, digest, data)
+
+            for name in names[i]:
+                cues[name] = digest
+                if link_dir is not None:
+                    self.link_object(obj, os.path.join(view_dir, f"{name}.hca"))
+
+        # Replaces any previous entry (and view), so cues dropped in a newer version of the ACB don't linger.
+        if link_dir is not None:
+            for filename in os.listdir(view_dir):
+                stem, ext = os.path.splitext(filename)
+                if ext == ".hca" and stem not in cues:
+                    os.remove(os.path.join(view_dir, filename))
+        manifest[acb_name] = cues
+        return manifest
+
+    def scan(self, a: dict = None) -> np.ndarray:
+        # Metadata-only inventory: reads just each entry's HCA header via the offset table,
+        # nothing is decrypted. One row per AWB entry; non-HCA or unreadable entries have
+        # hca=False, the latter with the reason in error.
+        # With a cue mapping (see ACB.extract), the name column holds the ;-joined cue names.
+        names = self.entry_names(a, strict=False) if a is not None else {}
+        count = len(self.ofs) - 1
+        width = max((len(";".join(v)) for v in names.values()), default=1)
+        table = np.zeros(count, dtype=AWBScanDtype + [("name", f"U{width}")])
+
+        for i in range(count):
+            row = table[i]
+            row["id"] = self.ids[i]
+            row["offset"] = self.ofs[i]
+            if i in names:
+                row["name"] = ";".join(names[i])
+
+            size = self.ofs[i + 1] - self.ofs[i]
+            if size <= 0:
+                row["error"] = f"ofs 非严格递增：ofs[{i}]={self.ofs[i]} >= ofs[{i+1}]={self.ofs[i + 1]}"
+                continue
+            row["size"] = size
+
+            head = self.read_header(i)
+            if not (head.startswith(HCAType.HCA.value) or head.startswith(HCAType.EHCA.value)):
+                continue
+
+            try:
+                info = read_hca_info(head)
+            except RuntimeError as e:
+                row["error"] = str(e)
+                continue
+            row["hca"] = True
+            for k, v in info.items():
+                row[k] = v
+            row["num_samples"] = info["frame_count"] * 1024 - info["encoder_delay"] - info["encoder_padding"]
+            if info["sample_rate"]:
+                row["duration"] = row["num_samples"] / info["sample_rate"]
+
+        return table
+
+    def read_header(self, i: int) -> bytes:
+        # Reads only the HCA header of entry i (header_size is a big-endian u16 at offset 6).
+        start = self.ofs[i]
+        size = self.ofs[i + 1] - start
+
+        self.stream.seek(start, 0)
+        data = self.stream.read(min(size, 0x200))
+        if len(data) >= 8:
+            header_size = int.from_bytes(data[6:8], "big")
+            if len(data) < header_size <= size:
+                data += self.stream.read(header_size - len(data))
+        return data
+
+    def entry_names(self, a: dict, strict: bool = True) -> dict:
+        # AWB index -> cue names (cues referencing several waveforms get a _#n suffix).
+        # strict also requires the mapping to cover every entry and the offsets to be increasing.
         rev = {}
         for name, idx_list in a.items():
             if len(idx_list) == 0:
                 continue
             if len(idx_list) == 1:
-                idx = idx_list[0]
-                if idx in rev:
-                    rev[idx] = rev[idx] + ";" + name
-                else:
-                    rev[idx] = name
+                rev.setdefault(idx_list[0], []).append(name)
             else:
                 for copy_num, idx in enumerate(idx_list, start=1):
-                    new_name = f"{name}_#{copy_num}"
-                    if idx in rev:
-                        rev[idx] = rev[idx] + ";" + new_name
-                    else:
-                        rev[idx] = new_name
+                    rev.setdefault(idx, []).append(f"{name}_#{copy_num}")
+
+        if not strict:
+            return rev
 
         segment_count = len(self.ofs) - 1
         if len(rev) != segment_count:
@@ -65,26 +174,72 @@ class AWB:
             if self.ofs[i] <= self.ofs[i - 1]:
                 raise ValueError(f"ofs 非严格递增：ofs[{i-1}]={self.ofs[i-1]} >= ofs[{i}]={self.ofs[i]}")
 
-        for i in tqdm(range(segment_count), ncols=150, position=1, leave=False):
-            if i not in rev:
-                continue
+        return rev
 
-            start = self.ofs[i]
-            end = self.ofs[i + 1]
-            size = end - start
+    def read_raw(self, i: int) -> bytes:
+        start = self.ofs[i]
+        end = self.ofs[i + 1]
 
-            self.stream.seek(start, 0)
-            data = self.stream.read(size)
+        self.stream.seek(start, 0)
+        return self.stream.read(end - start)
 
-            if data.startswith(HCAType.HCA.value):
-                pass
+    def read_entry(self, i: int) -> bytes:
+        # Reads entry i, decrypting it to ciph=0 if needed.
+        data = self.read_raw(i)
 
-            elif data.startswith(HCAType.EHCA.value):
-                data = decrypt(data, self.mainkey, self.subkey)
+        if data.startswith(HCAType.HCA.value):
+            pass
 
-            filename = os.path.join(exp_dir, f"{rev[i]}.hca")
-            with open(filename, "wb") as f:
-                f.write(data)
+        elif data.startswith(HCAType.EHCA.value):
+            data = decrypt(data, self.mainkey, self.subkey)
+
+        return data
+
+    def read_canonical(self, i: int) -> bytes:
+        # Like read_entry, but plain HCA entries also go through decrypt()'s header/frame rebuild,
+        # so a waveform yields the same bytes whether it was stored plain or encrypted and
+        # wherever it sits in the AWB (the rebuild drops pad chunks and alignment padding).
+        data = self.read_raw(i)
+        if data.startswith(HCAType.EHCA.value):
+            return decrypt(data, self.mainkey, self.subkey)
+        if not data.startswith(HCAType.HCA.value):
+            return data
+
+        try:
+            info = read_hca_info(data)
+        except RuntimeError:
+            return data
+        # VBR (frame_size 0) or truncated entries can't be rebuilt frame by frame; keep them as is.
+        if info["frame_size"] == 0 or info["header_size"] + info["frame_count"] * info["frame_size"] > len(data):
+            return data
+        return decrypt(data, self.mainkey, self.subkey)
+
+    @staticmethod
+    def store_object(store_dir: str, digest: str, data: bytes) -> str:
+        shard = os.path.join(store_dir, digest[:2])
+        obj = os.path.join(shard, f"{digest}.hca")
+        if os.path.exists(obj):
+            return obj
+
+        os.makedirs(shard, exist_ok=True)
+        # Write to a temp file first so an interrupted run never leaves a truncated object.
+        tmp = f"{obj}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, obj)
+        return obj
+
+    @staticmethod
+    def link_object(obj: str, filename: str):
+        if os.path.exists(filename):
+            if os.path.samefile(obj, filename):
+                return
+            os.remove(filename)
+        try:
+            os.link(obj, filename)
+        except OSError:
+            # Store and view on different filesystems (or no hardlink support).
+            shutil.copyfile(obj, filename)
 
     def stringtypes(self, intsize: int) -> str:
         if intsize == 1:
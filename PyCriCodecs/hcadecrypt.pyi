@@ -1,6 +1,22 @@
-from typing import Optional
+from typing import Optional, TypedDict
 
-__all__ = ["decrypt"]
+__all__ = ["decrypt", "read_hca_info", "HCAInfo"]
+
+class HCAInfo(TypedDict):
+    version: int
+    header_size: int
+    channels: int
+    sample_rate: int
+    frame_count: int
+    frame_size: int
+    encoder_delay: int
+    encoder_padding: int
+    loop_flag: bool
+    loop_start_frame: int
+    loop_end_frame: int
+    loop_start_delay: int
+    loop_end_padding: int
+    ciph_type: int
 
 def decrypt(data: bytes, mainkey: int, subkey: Optional[int] = ...) -> bytes:
     """
@@ -18,3 +34,16 @@ def decrypt(data: bytes, mainkey: int, subkey: Optional[int] = ...) -> bytes:
         bytes of the decrypted .hca file
     """
     ...
+
+def read_hca_info(data: bytes) -> HCAInfo:
+    """
+    Parse the header of an HCA file (plain or encrypted) without decrypting it.
+
+    Args:
+        data: HCA bytes; at least the first header_size bytes
+            (header_size is the big-endian u16 at offset 6)
+
+    Returns:
+        dict of header fields (channels, sample_rate, frame_count, loop points, ciph_type, ...)
+    """
+    ...
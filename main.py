@@ -1,12 +1,13 @@
+import json
 import argparse
+import numpy as np
+import numpy.lib.recfunctions as rfn
 from tqdm import tqdm
 from pathlib import Path
 from PyCriCodecs.acb import ACB
 from PyCriCodecs.awb import AWB
 
-def extract_one(acb_path, out_root, mainkey):
-    acb = ACB(str(acb_path))
-
+def open_awb(acb, acb_path, mainkey):
     embedded_awb_bytes = None
     try:
         payload = getattr(acb, "_payload", None)
@@ -25,18 +26,47 @@ def extract_one(acb_path, out_root, mainkey):
         if not external_awb.exists():
             return  
         awb = AWB(str(external_awb), mainkey)
+    return awb
+
+def extract_one(acb_path, out_root, mainkey, store_dir=None, manifest=None, link=False, in_root=None):
+    acb = ACB(str(acb_path))
+    awb = open_awb(acb, acb_path, mainkey)
+    if awb is None:
+        return
+
+    a = acb.extract()
+
+    if store_dir is not None:
+        acb_name = (acb_path.relative_to(in_root) if in_root else Path(acb_path.name)).with_suffix("").as_posix()
+        awb.extract_cas(a, str(store_dir), acb_name, manifest, str(out_root) if link else None)
+        return
 
     out_dir = out_root / acb_path.stem
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    a = acb.extract()
     AWB.extract(awb, a, str(out_dir))
 
+def scan_one(acb_path, mainkey):
+    acb = ACB(str(acb_path))
+    awb = open_awb(acb, acb_path, mainkey)
+    if awb is None:
+        return None
+    return awb.scan(acb.extract())
+
+def merge_scans(scans):
+    # scans: [(acb_name, table)] -> one structured array with an extra acb column.
+    acb_names, tables = zip(*scans)
+    acb = np.repeat(acb_names, [len(t) for t in tables])
+    return rfn.append_fields(np.concatenate(tables), "acb", acb, usemask=False)
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--in_dir",  default=r"D:\Dataset_Game\jp.co.cygames.princessconnectredive\RAW\v")
     parser.add_argument("--out_dir", default=r"D:\Dataset_Game\jp.co.cygames.princessconnectredive\EXP\v")
     parser.add_argument("--mainkey", default=0x000000000030D9E8)
+    parser.add_argument("--store_dir", default=None, help="去重模式：按内容哈希存放 hca，并在 out_dir 写 manifest.json")
+    parser.add_argument("--link", action="store_true", help="去重模式下在 out_dir 按 acb/cue 建硬链接视图")
+    parser.add_argument("--scan", action="store_true", help="只读各条目的 hca 头（不解密），在 out_dir 写 inventory.npy")
     args = parser.parse_args()
 
     root = Path(args.in_dir)
@@ -46,5 +76,31 @@ if __name__ == "__main__":
 
     acb_files = list(root.rglob("*.acb"))
 
-    for acb_path in tqdm(acb_files, ncols=150):
-        extract_one(acb_path, out_root, args.mainkey)
\ No newline at end of file
+    if args.scan:
+        scans = []
+        try:
+            for acb_path in tqdm(acb_files, ncols=150):
+                table = scan_one(acb_path, args.mainkey)
+                if table is not None:
+                    scans.append((acb_path.relative_to(root).with_suffix("").as_posix(), table))
+        finally:
+            if scans:
+                out_root.mkdir(parents=True, exist_ok=True)
+                np.save(out_root / "inventory.npy", merge_scans(scans))
+    else:
+        store_dir = Path(args.store_dir) if args.store_dir else None
+        manifest_path = out_root / "manifest.json"
+        manifest = {}
+        if store_dir is not None and manifest_path.exists():
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+
+        try:
+            for acb_path in tqdm(acb_files, ncols=150):
+                extract_one(acb_path, out_root, args.mainkey, store_dir, manifest, args.link, root)
+        finally:
+            # Also on interruption: objects already in the store stay reachable from the manifest.
+            if store_dir is not None:
+                out_root.mkdir(parents=True, exist_ok=True)
+                tmp_path = manifest_path.with_suffix(".json.tmp")
+                tmp_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=1, sort_keys=True), encoding="utf-8")
+                tmp_path.replace(manifest_path)
\ No newline at end of file
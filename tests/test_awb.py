@@ -0,0 +1,141 @@
+import os
+from pathlib import Path
+from struct import pack
+
+import pytest
+
+pytest.importorskip("PyCriCodecs.hca_decryptor")
+
+from PyCriCodecs.awb import AWB
+from PyCriCodecs.hca_decryptor import decrypt
+
+DOC = Path(__file__).resolve().parent.parent / "doc"
+MAINKEY = 0x000000000030D9E8
+SUBKEY = 0x5F3F
+
+
+def build_afs2(entries: list, align: int = 32, subkey: int = SUBKEY) -> bytes:
+    # Minimal AFS2: 2-byte ids, 4-byte offsets, each entry padded to align.
+    n = len(entries)
+    header = pack("<4sBBHIHH", b"AFS2", 1, 4, 2, n, align, subkey)
+    header += b"".join(pack("<H", i) for i in range(n))
+    headersize = 16 + 4 * (n + 1) + 2 * n
+    headersize += -headersize % align
+
+    body, ofs = b"", []
+    for data in entries:
+        ofs.append(headersize + len(body))
+        body += data + b"\0" * (-len(data) % align)
+    ofs.append(headersize + len(body))
+
+    header += b"".join(pack("<I", o) for o in ofs)
+    return header + b"\0" * (headersize - len(header)) + body
+
+
+@pytest.fixture
+def samples():
+    enc_a = (DOC / "vo_adv_0000011_001.hca").read_bytes()
+    enc_b = (DOC / "vo_adv_1001011_000.hca").read_bytes()
+    plain_a = decrypt(enc_a, MAINKEY, SUBKEY)
+    return enc_a, enc_b, plain_a
+
+
+def test_extract_cas_dedupes(tmp_path, samples):
+    enc_a, enc_b, plain_a = samples
+    # The same waveform encrypted and plain (at a different alignment), plus a different one.
+    awb = AWB(build_afs2([enc_a, plain_a + b"\0" * 5, enc_b]), MAINKEY)
+    cue_map = {"a": [0], "a_plain": [1], "b": [2]}
+    store, view = tmp_path / "store", tmp_path / "view"
+
+    manifest = awb.extract_cas(cue_map, str(store), "pkg/x", {}, str(view))
+
+    objects = sorted(p for p in store.rglob("*") if p.is_file())
+    assert len(objects) == 2
+    cues = manifest["pkg/x"]
+    assert cues["a"] == cues["a_plain"] != cues["b"]
+    assert (store / cues["a"][:2] / f"{cues['a']}.hca").read_bytes() == plain_a
+
+    links = view / "pkg" / "x"
+    assert os.stat(links / "a.hca").st_ino == os.stat(links / "a_plain.hca").st_ino
+    assert os.path.samefile(links / "b.hca", store / cues["b"][:2] / f"{cues['b']}.hca")
+
+    # A second run leaves the store untouched and replaces the manifest entry.
+    before = {p: p.stat().st_mtime_ns for p in objects}
+    manifest["pkg/x"]["stale"] = cues["b"]
+    (links / "stale.hca").write_bytes(b"")
+    awb.extract_cas(cue_map, str(store), "pkg/x", manifest, str(view))
+    assert {p: p.stat().st_mtime_ns for p in store.rglob("*") if p.is_file()} == before
+    assert set(manifest["pkg/x"]) == {"a", "a_plain", "b"}
+    assert not (links / "stale.hca").exists()
+
+
+def test_extract_unchanged_for_plain_entries(tmp_path, samples):
+    _, _, plain_a = samples
+    padded = plain_a + b"\0" * 5
+    awb = AWB(build_afs2([padded], align=1), MAINKEY)
+    awb.extract({"a": [0]}, str(tmp_path))
+    assert (tmp_path / "a.hca").read_bytes() == padded
+
+
+def crc16(data: bytes) -> int:
+    # HCA CRC-16 (poly 0x8005); a header followed by its CRC sums to 0.
+    s = 0
+    for b in data:
+        s ^= b << 8
+        for _ in range(8):
+            s = ((s << 1) ^ 0x8005 if s & 0x8000 else s << 1) & 0xFFFF
+    return s
+
+
+def test_extract_cas_keeps_vbr_audio(tmp_path, samples):
+    _, _, plain_a = samples
+    header_size = int.from_bytes(plain_a[6:8], "big")
+    assert plain_a[24:28] == b"comp"
+    header = plain_a[:28] + b"\0\0" + plain_a[30:header_size - 2]  # frame_size = 0
+    vbr = header + pack(">H", crc16(header)) + plain_a[header_size:]
+
+    awb = AWB(build_afs2([vbr], align=1), MAINKEY)
+    manifest = awb.extract_cas({"v": [0]}, str(tmp_path), "x", {})
+    digest = manifest["x"]["v"]
+    assert (tmp_path / digest[:2] / f"{digest}.hca").read_bytes() == vbr
+
+
+def test_scan_tolerates_bad_entries(samples):
+    enc_a, _, _ = samples
+    corrupt = bytearray(enc_a[:200])
+    corrupt[20] ^= 0xFF
+    awb = AWB(build_afs2([enc_a, bytes(corrupt), b"HCA\x00\x02\x00\x00\x00", b"ADX\x00xxxx"]), MAINKEY)
+
+    # The cue map covers only one of the four entries.
+    table = awb.scan({"a": [0]})
+    assert table["hca"].tolist() == [True, False, False, False]
+    assert table["name"].tolist() == ["a", "", "", ""]
+    assert table[0]["frame_count"] == 505 and table[0]["ciph_type"] == 56
+    assert table[0]["num_samples"] == 505 * 1024 - 128 - 225
+    assert "CRC failed" in table[1]["error"]
+    assert "header_size too small" in table[2]["error"]
+    assert table[3]["error"] == ""
+
+
+def test_scan_non_increasing_offsets(samples):
+    enc_a, enc_b, _ = samples
+    awb = AWB(build_afs2([enc_a, enc_b]), MAINKEY)
+    awb.ofs[1], awb.ofs[2] = awb.ofs[2], awb.ofs[1]
+
+    # Entry 0 now spans both entries (still readable), entry 1 has a negative size.
+    table = awb.scan()
+    assert table["hca"].tolist() == [True, False]
+    assert table[1]["size"] == 0 and table[1]["error"] != ""
+
+
+def test_merge_scans_widens_names(samples):
+    from main import merge_scans
+
+    enc_a, enc_b, _ = samples
+    short = AWB(build_afs2([enc_a]), MAINKEY).scan({"a": [0]})
+    long = AWB(build_afs2([enc_a, enc_b]), MAINKEY).scan({"a_much_longer_name": [0], "b": [1]})
+
+    merged = merge_scans([("x", short), ("dir/y", long)])
+    assert merged["name"].tolist() == ["a", "a_much_longer_name", "b"]
+    assert merged["acb"].tolist() == ["x", "dir/y", "dir/y"]
+    assert merged["frame_count"].tolist() == [505, 505, 335]
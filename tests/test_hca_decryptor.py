@@ -0,0 +1,89 @@
+from pathlib import Path
+from struct import pack
+
+import pytest
+
+hca_decryptor = pytest.importorskip("PyCriCodecs.hca_decryptor")
+
+DOC = Path(__file__).resolve().parent.parent / "doc"
+MAINKEY = 0x000000000030D9E8
+SUBKEY = 0x5F3F
+
+FMT = b"fmt\x00" + b"\x01" + (44100).to_bytes(3, "big") + pack(">IHH", 16, 128, 0)
+DEC = b"dec\x00" + pack(">H", 0x100) + bytes([1, 15, 16, 16, 0x10, 0])
+
+
+def crc16(data: bytes) -> int:
+    # HCA CRC-16 (poly 0x8005); a header followed by its CRC sums to 0.
+    s = 0
+    for b in data:
+        s ^= b << 8
+        for _ in range(8):
+            s = ((s << 1) ^ 0x8005 if s & 0x8000 else s << 1) & 0xFFFF
+    return s
+
+
+def make_header(chunks: bytes) -> bytes:
+    header = b"HCA\x00" + pack(">HH", 0x200, 8 + len(chunks) + 2) + chunks
+    return header + pack(">H", crc16(header))
+
+
+@pytest.mark.parametrize("name, frame_count", [("vo_adv_0000011_001.hca", 505), ("vo_adv_1001011_000.hca", 335)])
+def test_read_hca_info_samples(name, frame_count):
+    data = (DOC / name).read_bytes()
+    header_size = int.from_bytes(data[6:8], "big")
+
+    info = hca_decryptor.read_hca_info(data[:header_size])
+    assert info == hca_decryptor.read_hca_info(data)
+    assert info["header_size"] == header_size == 96
+    assert info["channels"] == 1
+    assert info["sample_rate"] == 44100
+    assert info["frame_count"] == frame_count
+    assert info["frame_size"] == 256
+    assert info["ciph_type"] == 56
+    assert not info["loop_flag"]
+
+    plain = hca_decryptor.decrypt(data, MAINKEY, SUBKEY)
+    assert hca_decryptor.read_hca_info(plain)["ciph_type"] == 0
+
+
+def test_read_hca_info_truncated_sample():
+    data = (DOC / "vo_adv_0000011_001.hca").read_bytes()
+    with pytest.raises(RuntimeError, match="File too small"):
+        hca_decryptor.read_hca_info(data[:4])
+    with pytest.raises(RuntimeError, match="head is too short"):
+        hca_decryptor.read_hca_info(data[:95])
+
+    corrupt = bytearray(data[:96])
+    corrupt[20] ^= 0xFF
+    with pytest.raises(RuntimeError, match="CRC failed"):
+        hca_decryptor.read_hca_info(bytes(corrupt))
+
+
+@pytest.mark.parametrize("header_size", [0, 8, 37])
+def test_read_hca_info_header_size_too_small(header_size):
+    data = b"HCA\x00" + pack(">HH", 0x200, header_size)
+    with pytest.raises(RuntimeError, match="header_size too small"):
+        hca_decryptor.read_hca_info(data + b"\0" * 64)
+
+
+def test_read_hca_info_minimal_header():
+    info = hca_decryptor.read_hca_info(make_header(FMT + DEC))
+    assert info["header_size"] == 38
+    assert info["frame_count"] == 16
+    assert info["frame_size"] == 0x100
+
+
+@pytest.mark.parametrize("chunks", [
+    FMT + b"comp" + bytes(8),            # comp needs 16 bytes
+    FMT + DEC + b"loop" + bytes(4),      # loop needs 16 bytes
+    FMT + DEC + b"comm\xff" + b"abc",    # comment length past the header
+])
+def test_read_hca_info_chunk_overrun(chunks):
+    with pytest.raises(RuntimeError, match="overruns header_size"):
+        hca_decryptor.read_hca_info(make_header(chunks))
+
+
+def test_read_hca_info_comm_and_pad():
+    info = hca_decryptor.read_hca_info(make_header(FMT + DEC + b"comm\x03abc" + b"pad\x00" + bytes(6)))
+    assert info["frame_count"] == 16